@@ -1,9 +1,20 @@
+import os
+
 from setuptools import setup, find_packages
 
 
+def _read_version() -> str:
+    # Read without importing the package, which would pull in its dependencies.
+    namespace = {}
+    path = os.path.join(os.path.dirname(__file__), 'volcengine_kit', '_version.py')
+    with open(path, encoding='utf-8') as f:
+        exec(f.read(), namespace)
+    return namespace['__version__']
+
+
 setup(
     name='volcengine_kit',
-    version='0.0.1',
+    version=_read_version(),
     url='https://github.com/wjk376/volcengine-kit',
     author='Jiankun Wang',
     packages=find_packages(),
@@ -13,6 +24,9 @@ setup(
         'pydantic>=2.8.0',
         'lark-oapi>=1.2.5',
     ],
+    extras_require={
+        'speedups': ['orjson>=3.9'],
+    },
     python_requires='>=3.8',
     platforms='any',
 )
\ No newline at end of file
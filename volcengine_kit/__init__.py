@@ -1,2 +1,3 @@
+from ._version import __version__
 from .client import VolcMLPlatformClient
 from .task import VolcMLPlatformTask
\ No newline at end of file
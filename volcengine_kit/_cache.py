@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """A minimal thread-safe cache whose entries expire after `ttl` seconds."""
+    def __init__(self, ttl: float, maxsize: int = 128) -> None:
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        # Loads in progress, so that concurrent misses of a key share one call.
+        self._loading: Dict[Hashable, Future] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return cached value of `key`, calling `loader` to fill it on miss.
+
+        `loader` runs without holding the cache lock, so a slow miss only holds up 
+        other callers of the same key, which share its result.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self._ttl:
+                return entry[1]
+            fut = self._loading.get(key)
+            if fut is None:
+                fut = self._loading[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return fut.result()
+        
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                if self._loading.get(key) is fut:
+                    del self._loading[key]
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            # Not stored if invalidated while loading.
+            if self._loading.get(key) is fut:
+                del self._loading[key]
+                self._put(key, time.monotonic(), value)
+        fut.set_result(value)
+        return value
+
+    def setdefault(self, key: Hashable, value: Any) -> Any:
+        """Return unexpired value of `key` if any, otherwise store `value` and return it."""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._data.get(key)
+            if entry is not None and now - entry[0] < self._ttl:
+                return entry[1]
+            self._put(key, now, value)
+            return value
+
+    def _put(self, key: Hashable, now: float, value: Any) -> None:
+        # Caller must hold `self._lock`.
+        self._data.pop(key, None)
+        if len(self._data) >= self._maxsize:
+            # Oldest entries come first.
+            del self._data[next(iter(self._data))]
+        self._data[key] = (now, value)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop `key`, or every entry if `key` is None."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self._loading.clear()
+            else:
+                self._data.pop(key, None)
+                self._loading.pop(key, None)
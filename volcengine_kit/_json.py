@@ -0,0 +1,28 @@
+"""JSON helpers that use `orjson` when installed and fall back to stdlib `json`."""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
+
+
+if orjson is not None:
+    JSONDecodeError = orjson.JSONDecodeError
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def dumps_pretty(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+else:
+    JSONDecodeError = json.JSONDecodeError
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def dumps_pretty(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
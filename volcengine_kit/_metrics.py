@@ -0,0 +1,40 @@
+import threading
+from typing import Dict, Union
+
+
+class TrackerMetrics:
+    """Counters of task status polling, updated from tracker worker threads."""
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight_polls = 0
+        self._polls_total = 0
+        self._poll_seconds_total = 0.0
+        self._poll_seconds_max = 0.0
+        self._terminal_transitions_total = 0
+
+    def poll_started(self) -> None:
+        with self._lock:
+            self._in_flight_polls += 1
+
+    def poll_finished(self, seconds: float, terminal: bool) -> None:
+        with self._lock:
+            self._in_flight_polls -= 1
+            self._polls_total += 1
+            self._poll_seconds_total += seconds
+            if seconds > self._poll_seconds_max:
+                self._poll_seconds_max = seconds
+            if terminal:
+                self._terminal_transitions_total += 1
+
+    def snapshot(self) -> Dict[str, Union[int, float]]:
+        """Current values as a flat dict, ready for any metrics exporter."""
+        with self._lock:
+            polls = self._polls_total
+            return {
+                'in_flight_polls': self._in_flight_polls,
+                'polls_total': polls,
+                'avg_poll_latency_ms':
+                    1000 * self._poll_seconds_total / polls if polls else 0.0,
+                'max_poll_latency_ms': 1000 * self._poll_seconds_max,
+                'terminal_transitions_total': self._terminal_transitions_total,
+            }
@@ -1,24 +1,32 @@
-import json
-from typing import Dict, Any, List, Optional
+import threading
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union
 
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from requests.exceptions import Timeout, ConnectionError as RequestsConnectionError
+from urllib3.util.retry import Retry
 from volcengine.base.Service import Service
 from volcengine.auth.SignerV4 import SignerV4
+from volcengine.auth.MetaData import MetaData
+from volcengine.util.Util import Util
 from volcengine.ApiInfo import ApiInfo
 from volcengine.ServiceInfo import ServiceInfo
 from volcengine.Credentials import Credentials
 
+from . import _json
+from ._cache import TTLCache
 from .data._receive import (
     GetResourceQueueResultModel,
     GetCustomTaskResultModel,
-    FlavorModel,
     FlavorsByZone,
+    LazyFlavorsByZone,
     VepfsMountModel,
     GetImageRepoResultModel,
 )
 
 
-ACTIONS = (
+ACTIONS = frozenset((
     'CreateCustomTask', 
     'GetCustomTask', 
     'ListCustomTasks', 
@@ -34,7 +42,22 @@ ACTIONS = (
     'ListMountPoints',
     'ListFlavorsV2',
     'GetUserVepfsFilesetPermission',
-)
+))
+
+_POOL_CONNECTIONS = 32
+_POOL_MAXSIZE = 64
+_FLAVORS_CACHE_TTL = 300  # seconds
+_IMAGE_REPO_CACHE_TTL = 300  # seconds
+_VEPFS_MOUNT_CACHE_TTL = 300  # seconds
+_NOT_FOUND_CODES = frozenset(('InvalidParameter', 'ResourceNotFound'))
+
+
+def _require_str(value: Any, name: str) -> None:
+    if not isinstance(value, str):
+        raise TypeError(
+            f'Expected string type {name} but got {type(value).__qualname__}'
+        )
+
 
 def _build_api_info(action: str) -> ApiInfo:
     return ApiInfo(
@@ -43,6 +66,45 @@ def _build_api_info(action: str) -> ApiInfo:
     )
 
 
+# Shared by all service instances, which only read from it.
+_API_INFO_TABLE = {action: _build_api_info(action) for action in ACTIONS}
+
+
+@lru_cache(maxsize=16)
+def _get_signing_key(sk: str, date: str, region: str, service: str) -> bytes:
+    """Derived signing key only changes with date, so compute it once per day."""
+    return SignerV4.get_signing_secret_key_v4(sk, date, region, service)
+
+
+def _sign(request, credentials: Credentials) -> None:
+    """Same as `SignerV4.sign` except that signing keys are cached."""
+    if request.path == '':
+        request.path = '/'
+    if request.method != 'GET' and 'Content-Type' not in request.headers:
+        request.headers['Content-Type'] = 'application/x-www-form-urlencoded; charset=utf-8'
+
+    format_date = SignerV4.get_current_format_date()
+    request.headers['X-Date'] = format_date
+    if credentials.session_token != '':
+        request.headers['X-Security-Token'] = credentials.session_token
+
+    md = MetaData()
+    md.set_algorithm('HMAC-SHA256')
+    md.set_service(credentials.service)
+    md.set_region(credentials.region)
+    md.set_date(format_date[:8])
+
+    hashed_canon_req = SignerV4.hashed_canonical_request_v4(request, md)
+    md.set_credential_scope('/'.join([md.date, md.region, md.service, 'request']))
+
+    signing_str = '\n'.join(
+        [md.algorithm, format_date, md.credential_scope, hashed_canon_req]
+    )
+    signing_key = _get_signing_key(credentials.sk, md.date, md.region, md.service)
+    sign = Util.to_hex(Util.hmac_sha256(signing_key, signing_str))
+    request.headers['Authorization'] = SignerV4.build_auth_header_v4(sign, md, credentials)
+
+
 class CallVolcAPIError(Exception):
     def __init__(self, api: str, error: Dict[str, Any]) -> None:
         self.api = api
@@ -60,11 +122,17 @@ class InvalidTaskIdError(Exception):
 
 class VolcMLPlatformService(Service):
     """A class that wraps common functionalities of platform."""
+    # Responses from platform are trusted and built into models without validation.
+    # Set to False to validate them strictly.
+    _trust_server_responses = True
+    
     def __init__(
         self, 
         credentials: Credentials,
         connection_timeout: int = 10,
         socket_timeout: int = 10,
+        pool_connections: int = _POOL_CONNECTIONS,
+        pool_maxsize: int = _POOL_MAXSIZE,
     ) -> None:
         service_info = ServiceInfo(
             host='open.volcengineapi.com',
@@ -74,38 +142,62 @@ class VolcMLPlatformService(Service):
             socket_timeout=socket_timeout,
             scheme='http',
         )
-        api_info = {action: _build_api_info(action) for action in ACTIONS}
-        super().__init__(service_info, api_info)
+        super().__init__(service_info, _API_INFO_TABLE)
+        
+        # Reuse sockets across calls. Only retry on connection failures and statuses
+        # meaning the request was not processed. Never retry on read errors or on
+        # 502/504, which may come back after the backend has acted, so that
+        # non-idempotent actions like `CreateCustomTask` are not sent twice.
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=3,
+                read=0,
+                backoff_factor=0.2,
+                status_forcelist=(429, 503),
+                allowed_methods=frozenset(['POST']),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+        
+        self._flavors_cache = TTLCache(ttl=_FLAVORS_CACHE_TTL, maxsize=1)
+        self._image_repo_cache = TTLCache(ttl=_IMAGE_REPO_CACHE_TTL, maxsize=64)
+        self._vepfs_mount_cache = TTLCache(ttl=_VEPFS_MOUNT_CACHE_TTL, maxsize=64)
     
     def call_api(
         self, 
         api: str, 
-        form: Dict[str, Any],
+        form: Union[Dict[str, Any], bytes],
         **kwds,
     ) -> Dict[str, Any]:
-        """Overload original `json` method."""
+        """Overload original `json` method. `form` can also be serialized JSON."""
         try:
-            if api not in self.api_info:
+            api_info = self.api_info.get(api)
+            if api_info is None:
                 raise ValueError(f'Unregistered API `{api}`')
-            api_info = self.api_info[api]
-            body = json.dumps(form)
+            body = form if isinstance(form, bytes) else _json.dumps(form)
             r = self.prepare_request(api_info, params={})
             r.headers['Content-Type'] = 'application/json'
+            r.headers['Content-Length'] = str(len(body))
             r.body = body
 
-            SignerV4.sign(r, self.service_info.credentials)
+            _sign(r, self.service_info.credentials)
 
             url = r.build()
             resp = self.session.post(
                 url, 
                 headers=r.headers, 
-                data=r.body,
+                data=body,
                 timeout=(
                     self.service_info.connection_timeout, 
                     self.service_info.socket_timeout,
                 ),
             )
-            resp_data = resp.json()
+            resp_data = _json.loads(resp.content)
             if resp.status_code != 200:
                 resp_meta = resp_data.get('ResponseMetadata', {})
                 raise CallVolcAPIError(
@@ -121,6 +213,18 @@ class VolcMLPlatformService(Service):
                 )
         except CallVolcAPIError as e:
             raise
+        except Timeout as e:
+            raise CallVolcAPIError(
+                api=api, error={'Code': 'Timeout', 'Message': str(e)},
+            ) from e
+        except RequestsConnectionError as e:
+            raise CallVolcAPIError(
+                api=api, error={'Code': 'ConnectionError', 'Message': str(e)},
+            ) from e
+        except _json.JSONDecodeError as e:
+            raise CallVolcAPIError(
+                api=api, error={'Code': 'InvalidResponse', 'Message': str(e)},
+            ) from e
         except Exception as e:
             raise CallVolcAPIError(
                 api=api, error={'Code': 'Other', 'Message': str(e)},
@@ -129,6 +233,16 @@ class VolcMLPlatformService(Service):
             return resp_data['Result']
         
     def get_vepfs_mount(self, qid: str) -> VepfsMountModel:
+        """Get vePFS mount of queue. Results are cached for `_VEPFS_MOUNT_CACHE_TTL` 
+        seconds.
+        """
+        return self._vepfs_mount_cache.get(qid, lambda: self._fetch_vepfs_mount(qid))
+    
+    def invalidate_vepfs_mounts(self, qid: Optional[str] = None) -> None:
+        """Drop cached vePFS mount of queue `qid`, or of all queues if it is None."""
+        self._vepfs_mount_cache.invalidate(qid)
+        
+    def _fetch_vepfs_mount(self, qid: str) -> VepfsMountModel:
         resp = self.call_api(
             api='ListMountPoints', 
             form={'StorageType': 'Vepfs', 'ResourceQueueId': qid},
@@ -138,10 +252,13 @@ class VolcMLPlatformService(Service):
             if 'VepfsId' in mount and mount.get('Status') == 'Running':
                 # XXX Only care about the first valid one.
                 fs = self._get_vepfs_fileset(vepfs_id=mount['VepfsId'])
-                vepfs_mount = VepfsMountModel(
-                    ReadWriteDirectories=fs['ReadWriteDirectories'],
-                    ReadOnlyDirectories=fs['ReadOnlyDirectories'],
-                    **mount,
+                vepfs_mount = VepfsMountModel.from_response(
+                    {
+                        **mount,
+                        'ReadWriteDirectories': fs['ReadWriteDirectories'],
+                        'ReadOnlyDirectories': fs['ReadOnlyDirectories'],
+                    },
+                    trusted=self._trust_server_responses,
                 )
                 break
             
@@ -157,15 +274,12 @@ class VolcMLPlatformService(Service):
         return resp['VepfsIdToDirectories'][vepfs_id]
     
     def get_resource_queue(self, qid: str) -> GetResourceQueueResultModel:
-        if not isinstance(qid, str):
-            raise TypeError(
-                f'Expected string type queue ID but got {qid.__class__.__qualname__}'
-            )
+        _require_str(qid, 'queue ID')
             
         try:
             resp = self.call_api(api='GetResourceQueue', form={'Id': qid})
         except CallVolcAPIError as e:
-            if e.code in ('InvalidParameter', 'ResourceNotFound'):
+            if e.code in _NOT_FOUND_CODES:
                 raise ValueError(f'Resource queue [{qid}] does not exist') from None
             else:
                 raise
@@ -174,42 +288,83 @@ class VolcMLPlatformService(Service):
             raise ValueError(f'Invalid role for queue {qid}')
         if resp.get('State') != 'Running':
             raise ValueError(f'Invalid state `{resp.get("State")}` for queue {qid}')
-        return GetResourceQueueResultModel(**resp)
+        return GetResourceQueueResultModel.from_response(
+            resp, trusted=self._trust_server_responses,
+        )
             
     def list_flavors(self) -> FlavorsByZone:
-        resp = self.call_api(api='ListFlavorsV2', form={'DisplayType': 'Scheduling'})        
-        flavors_by_zone = {}
-        for zone_id, raw_zone_flavors in resp.get('List', {}).items():
-            zone_flavors = {}
-            for raw_type_flavors in raw_zone_flavors.values():
-                for raw_flavor in raw_type_flavors:
-                    flavor = FlavorModel(**raw_flavor)
-                    zone_flavors[flavor.Id] = flavor
-            flavors_by_zone[zone_id] = zone_flavors
+        """List flavors by zone. Results are cached for `_FLAVORS_CACHE_TTL` seconds."""
+        return self._flavors_cache.get('flavors', self._fetch_flavors)
         
-        return flavors_by_zone
+    def invalidate_flavors(self) -> None:
+        """Drop cached flavors so that the next `list_flavors` call refetches."""
+        self._flavors_cache.invalidate()
+            
+    def _fetch_flavors(self) -> FlavorsByZone:
+        """Fetch flavors by zone, leaving out deprecated ones."""
+        resp = self.call_api(api='ListFlavorsV2', form={'DisplayType': 'Scheduling'})
+        return LazyFlavorsByZone(
+            resp.get('List', {}), trusted=self._trust_server_responses,
+        )
 
     def query_task(self, task_id: str) -> GetCustomTaskResultModel:
-        if not isinstance(task_id, str):
-            raise TypeError(
-                f'Expected string type task ID but got {task_id.__class__.__qualname__}'
-            )
+        _require_str(task_id, 'task ID')
             
         try:
             resp = self.call_api('GetCustomTask', form={'Id': task_id})
-            return GetCustomTaskResultModel(**resp)
+            return GetCustomTaskResultModel.from_response(
+                resp, trusted=self._trust_server_responses,
+            )
         except CallVolcAPIError as e:
-            if e.code in ('InvalidParameter', 'ResourceNotFound'):
+            if e.code in _NOT_FOUND_CODES:
                 raise InvalidTaskIdError(f'Custom task [{task_id}] does not exist') from None
             else:
                 raise
         
     def get_image_repo(self, repo: str) -> GetImageRepoResultModel:
+        """Get image repo. Results are cached for `_IMAGE_REPO_CACHE_TTL` seconds."""
+        return self._image_repo_cache.get(repo, lambda: self._fetch_image_repo(repo))
+    
+    def invalidate_image_repos(self, repo: Optional[str] = None) -> None:
+        """Drop cached image repo `repo`, or all image repos if it is None."""
+        self._image_repo_cache.invalidate(repo)
+        
+    def _fetch_image_repo(self, repo: str) -> GetImageRepoResultModel:
         try:
             resp = self.call_api(api='GetImageRepo', form={'Id': repo})
-            return GetImageRepoResultModel(**resp)
+            return GetImageRepoResultModel.from_response(
+                resp, trusted=self._trust_server_responses,
+            )
         except CallVolcAPIError as e:
-            if e.code in ('InvalidParameter', 'ResourceNotFound'):
+            if e.code in _NOT_FOUND_CODES:
                 raise ValueError(f'Image repo [{repo}] does not exist') from None
             else:
-                raise
\ No newline at end of file
+                raise
+
+
+_shared_services: Dict[tuple, VolcMLPlatformService] = {}
+_shared_services_lock = threading.Lock()
+
+
+def get_shared_service(
+    credentials: Credentials,
+    connection_timeout: int = 10,
+    socket_timeout: int = 10,
+) -> VolcMLPlatformService:
+    """Service shared by everyone using the same credentials and timeouts, so that 
+    its connection pool is reused.
+    """
+    key = (
+        credentials.ak, credentials.sk, credentials.session_token,
+        credentials.service, credentials.region, 
+        connection_timeout, socket_timeout,
+    )
+    with _shared_services_lock:
+        service = _shared_services.get(key)
+        if service is None:
+            service = _shared_services[key] = VolcMLPlatformService(
+                credentials=credentials,
+                connection_timeout=connection_timeout,
+                socket_timeout=socket_timeout,
+            )
+        return service
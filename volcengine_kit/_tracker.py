@@ -0,0 +1,112 @@
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from ._metrics import TrackerMetrics
+
+if TYPE_CHECKING:
+    from .task import VolcMLPlatformTask
+
+
+_MAX_POLL_WORKERS = 8
+
+# (deadline, sequence, task, delay before this poll)
+_Entry = Tuple[float, int, 'VolcMLPlatformTask', Union[int, float]]
+
+
+class TaskTracker:
+    """Polls status of every live task from one scheduler thread and a small worker pool.
+
+    Tasks are held until they reach a terminal state, so they keep being tracked even if
+    the caller drops them. All threads are daemons and never hold up interpreter exit.
+    """
+    def __init__(self, max_workers: int = _MAX_POLL_WORKERS) -> None:
+        self._seq = itertools.count()
+        self._max_workers = max_workers
+        self._reset()
+
+    def _reset(self) -> None:
+        self._cond = threading.Condition()
+        self._heap: List[_Entry] = []
+        # Tasks whose deadline has passed, waiting for a free worker.
+        self._due: 'queue.SimpleQueue[Tuple[VolcMLPlatformTask, Union[int, float]]]' = \
+            queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self.metrics = TrackerMetrics()
+
+    def register(self, task: 'VolcMLPlatformTask', delay: Union[int, float]) -> None:
+        """Poll `task` after `delay` seconds, then after whatever delay its `_poll`
+        returns, until it returns None.
+        """
+        with self._cond:
+            self._schedule(task, delay)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='Task tracking', daemon=True,
+                )
+                self._thread.start()
+                for i in range(self._max_workers):
+                    threading.Thread(
+                        target=self._work, name=f'Task tracking worker {i}', daemon=True,
+                    ).start()
+
+    def _schedule(self, task: 'VolcMLPlatformTask', delay: Union[int, float]) -> None:
+        # Caller must hold `self._cond`.
+        deadline = time.monotonic() + delay
+        heapq.heappush(self._heap, (deadline, next(self._seq), task, delay))
+        self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                timeout = self._heap[0][0] - time.monotonic()
+                if timeout > 0:
+                    # Woken early if an earlier deadline is pushed.
+                    self._cond.wait(timeout)
+                    continue
+                _, _, task, delay = heapq.heappop(self._heap)
+            self._due.put((task, delay))
+
+    def _work(self) -> None:
+        while True:
+            task, delay = self._due.get()
+            self._poll(task, delay)
+            del task
+
+    def _poll(self, task: 'VolcMLPlatformTask', delay: Union[int, float]) -> None:
+        self.metrics.poll_started()
+        t0 = time.perf_counter()
+        next_delay, terminal = delay, False
+        try:
+            next_delay = task._poll()
+            terminal = next_delay is None
+        except Exception as e:
+            # Keep tracking with the previous delay rather than losing the task.
+            logger.exception(e)
+            next_delay = delay
+        finally:
+            self.metrics.poll_finished(time.perf_counter() - t0, terminal=terminal)
+        if next_delay is not None:
+            with self._cond:
+                self._schedule(task, next_delay)
+
+    def metrics_snapshot(self) -> Dict[str, Union[int, float]]:
+        """Polling metrics plus the number of tasks waiting for their next poll."""
+        snapshot = self.metrics.snapshot()
+        with self._cond:
+            snapshot['pending_tasks'] = len(self._heap)
+        return snapshot
+
+
+GLOBAL_TRACKER = TaskTracker()
+# Threads do not survive fork, so a child starts over with an empty tracker whose
+# threads are started again by its first `register`.
+os.register_at_fork(after_in_child=GLOBAL_TRACKER._reset)
@@ -1,49 +1,48 @@
-import json
+import os
 import re
-from functools import wraps
-from typing import Dict, Optional, List, Literal, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
+from typing import Callable, Dict, Hashable, Optional, List, Literal, Union
 
 from loguru import logger
 from volcengine.Credentials import Credentials
-import lark_oapi as lark
 
+from . import _json
+from ._cache import TTLCache
 from ._service import (
     VolcMLPlatformService, 
     InvalidTaskIdError,
     CallVolcAPIError,
+    _POOL_CONNECTIONS,
+    _POOL_MAXSIZE,
+    _require_str,
 )
+from ._tracker import GLOBAL_TRACKER
 from .task import VolcMLPlatformTask
 from .data._receive import (
+    _HPC_GPU_TYPE,
     GetResourceQueueResultModel,
+    FlavorModel,
     FlavorsByZone,
 )
 from .data._send import (
     VepfsStorageModel,
-    EnvModel,
     ImageSpecModel,
     TaskRoleSpecModel,
     ResourceSpecModel,
-    TaskFormModel,
+    build_task_form_json,
 )
-from .utils import feishu
 
 
-def handle_exceptions(func):
-    @wraps(func)
-    def wrapper(*args, **kwds):
-        handle = kwds.pop('handle_exceptions', False)
-        if handle:
-            try:
-                return func(*args, **kwds)
-            except Exception as e:
-                logger.exception(e)
-                return
-        else:  # do nothing
-            return func(*args, **kwds)
-    return wrapper
-    
-    
+_MAX_LOOKUP_WORKERS = 8
+_IMAGE_URL_CACHE_TTL = 3600  # seconds
+_STOP_WARNING_STATES = frozenset(('Success', 'Failed', 'Cancelled', 'Killed', 'Exception'))
+_DELETE_SUPPRESSED_CODES = frozenset(('UnauthorizedOperation', 'CustomTaskNotInTerminalState'))
+
+
 class VolcMLPlatformClient:
+    _TASK_NAME_PATTERN = re.compile(r'[\u4e00-\u9fa50-9a-zA-Z_-]{1,200}')
+    
     def __init__(
         self, 
         access_key_id: str, 
@@ -53,7 +52,23 @@ class VolcMLPlatformClient:
         socket_timeout: int = 10,
         bot_app_id: Optional[str] = None,
         bot_app_secret: Optional[str] = None,
+        pool_connections: int = _POOL_CONNECTIONS,
+        pool_maxsize: int = _POOL_MAXSIZE,
     ) -> None:
+        """Create a client of Volcano Engine ML platform.
+        
+        Args:
+            access_key_id: Access key ID of IAM user.
+            secret_access_key: Secret access key of IAM user.
+            iam_user_id: ID of IAM user.
+            connection_timeout: Number of seconds to wait for connecting to platform.
+            socket_timeout: Number of seconds to wait for platform responses.
+            bot_app_id: App ID of Feishu bot. Required to send Feishu messages.
+            bot_app_secret: App secret of Feishu bot. Required to send Feishu messages.
+            pool_connections: Number of connection pools cached by the HTTP session.
+            pool_maxsize: Maximum number of keep-alive connections kept in each pool.
+                Raise it if many lookups or tasks are expected to run concurrently.
+        """
         self._credentials = Credentials(
             ak=access_key_id,
             sk=secret_access_key,
@@ -65,63 +80,112 @@ class VolcMLPlatformClient:
         self._iam_user_id = iam_user_id
         self._connection_timeout = connection_timeout
         self._socket_timeout = socket_timeout
-        self._task_name_pattern = re.compile(r'^[\u4e00-\u9fa50-9a-zA-Z_-]{1,200}$')
         self._service = VolcMLPlatformService(
             credentials=self._credentials,
             connection_timeout=self._connection_timeout,
             socket_timeout=self._socket_timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
         )
-        self._lark_client = None
-        if bot_app_id is not None and bot_app_secret is not None:
-            self._lark_client = lark.Client.builder() \
-                .app_id(bot_app_id) \
-                .app_secret(bot_app_secret) \
-                .build()
+        # Image URLs that are known to exist, keyed by (repo, tag).
+        self._image_url_cache = TTLCache(ttl=_IMAGE_URL_CACHE_TTL, maxsize=256)
+        # Runs concurrent platform lookups, see `_get_executor`.
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._bot_app_id = bot_app_id
+        self._bot_app_secret = bot_app_secret
+        self._feishu_enabled = bot_app_id is not None and bot_app_secret is not None
+        
+    @cached_property
+    def _lark_client(self):
+        """Feishu client, built on first use."""
+        # Imported lazily since `lark_oapi` is slow to import.
+        import lark_oapi as lark
+        return lark.Client.builder() \
+            .app_id(self._bot_app_id) \
+            .app_secret(self._bot_app_secret) \
+            .build()
+    
+    def prewarm(self, image_repos: List[str] = []) -> None:
+        """Fill caches of flavors and provided image repos, so that following task
+        submissions skip these lookups.
+        """
+        self._service.list_flavors()
+        for repo in image_repos:
+            self._service.get_image_repo(repo)
+            
+    def invalidate_caches(self) -> None:
+        """Drop cached flavors, image repos and vePFS mounts."""
+        self._image_url_cache.invalidate()
+        self._service.invalidate_flavors()
+        self._service.invalidate_image_repos()
+        self._service.invalidate_vepfs_mounts()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Executor threads do not survive fork, so each process builds its own.
+        pid = os.getpid()
+        if self._executor_pid != pid:
+            self._executor = ThreadPoolExecutor(
+                max_workers=_MAX_LOOKUP_WORKERS, thread_name_prefix='volc-lookup',
+            )
+            self._executor_pid = pid
+        return self._executor
+    
+    @staticmethod
+    def tracking_metrics() -> Dict[str, Union[int, float]]:
+        """Metrics of status polling shared by all tracked tasks, e.g. number of 
+        in-flight polls, average poll latency and number of tasks waiting to be polled.
+        """
+        return GLOBAL_TRACKER.metrics_snapshot()
     
     def _find_optimal_queue(
         self,
-        default_qid: str,
+        queue_futures: List['Future[GetResourceQueueResultModel]'],
         flavor_id: str,
         flavors_by_zone: FlavorsByZone,
-        backup_qids: List[str] = [],
         cpu_buffer: int = 0,
         memory_buffer: int = 0,
         volume_buffer: int = 5,
     ) -> GetResourceQueueResultModel:
         """Use default queue if it meets resource requirements of the provided buffer,
         otherwise check each backup queue.
+        
+        Args:
+            queue_futures: Futures of fetching the default queue followed by backup
+                queues, in order of priority.
         """
-        if not isinstance(flavor_id, str):
-            raise TypeError(
-                f'Expected string type flavor ID but got {flavor_id.__class__.__qualname__}'
-            )
-        if any(
-            (not isinstance(x, (int, float))) or (x < 0) 
-            for x in [cpu_buffer, memory_buffer, volume_buffer]
-        ):
-            raise TypeError('Resource buffers must be non-negative numbers')
+        # Flavor checks only depend on zone, so do them once per zone.
+        flavor_by_zone: Dict[str, FlavorModel] = {}
+        
+        def get_zone_flavor(zone_id: str) -> FlavorModel:
+            flavor = flavor_by_zone.get(zone_id)
+            if flavor is None:
+                zone_flavors = flavors_by_zone[zone_id]
+                if flavor_id not in zone_flavors:
+                    # Deprecated flavors are left out when listing.
+                    raise ValueError(
+                        f'Flavor {flavor_id} not in zone `{zone_id}` or is deprecated'
+                    )
+                flavor = zone_flavors[flavor_id]
+                if flavor.Type == _HPC_GPU_TYPE:
+                    raise ValueError(f'{flavor} is not supported')
+                flavor_by_zone[zone_id] = flavor
+            return flavor
         
         def is_queue_vacant(q: GetResourceQueueResultModel) -> bool:
-            zone_flavors = flavors_by_zone[q.ZoneId]
-            if flavor_id not in zone_flavors:
-                raise ValueError(
-                    f'Flavor {flavor_id} not in zone `{q.ZoneId}` of queue {q}'
-                )
-            flavor = zone_flavors[flavor_id]
-            if flavor.Deprecated:
-                raise ValueError(f'{flavor} is deprecated')
+            flavor = get_zone_flavor(q.ZoneId)
             if not q.fit_flavor(flavor):
                 raise ValueError(f'{q} does not fit {flavor}')
             return q.is_vacant_for(flavor, cpu_buffer, memory_buffer, volume_buffer)
                         
-        default_q = self._service.get_resource_queue(default_qid)
+        default_q = queue_futures[0].result()
         if is_queue_vacant(default_q):
             return default_q
                             
         # Loop through backup queues and find if any is available.
-        for backup_qid in backup_qids:
+        for future in queue_futures[1:]:
             try:
-                backup_q = self._service.get_resource_queue(backup_qid)
+                backup_q = future.result()
                 backup_q_vacant = is_queue_vacant(backup_q)
             except Exception as e:
                 # Omit errors in backup queues.
@@ -135,21 +199,31 @@ class VolcMLPlatformClient:
         return default_q
     
     def _validate_image(self, repo: str, tag: str) -> str:
-        if any(not isinstance(x, str) for x in (repo, tag)):
-            raise TypeError('Image repo and tag must be string type')
+        _require_str(repo, 'image repo')
+        _require_str(tag, 'image tag')
+        return self._image_url_cache.get(
+            (repo, tag), lambda: self._lookup_image_url(repo, tag),
+        )
+    
+    def _lookup_image_url(self, repo: str, tag: str) -> str:
         model = self._service.get_image_repo(repo)
         url = f'{repo}:{tag}'
-        if url not in model.Tags:
+        if url not in model.tag_set:
+            # The tag might have been pushed after the repo was cached.
+            self._service.invalidate_image_repos(repo)
+            model = self._service.get_image_repo(repo)
+        if url not in model.tag_set:
             raise ValueError(f'`{tag}` does not exist in image repo [{repo}]')
         return url
     
     def _validate_task_name(self, name: str) -> None:
-        if not isinstance(name, str):
-            raise TypeError(
-                f'Expected string type task name but got {name.__class__.__qualname__}'
-            )
-        match = re.match(self._task_name_pattern, name)
-        if match is None:
+        _require_str(name, 'task name')
+        if not 0 < len(name) <= 200:
+            raise ValueError(f'Task name `{name}` is invalid')
+        if name.isascii() and name.replace('_', '').replace('-', '').isalnum():
+            # Plain ASCII names need no regex.
+            return
+        if self._TASK_NAME_PATTERN.fullmatch(name) is None:
             raise ValueError(f'Task name `{name}` is invalid')
     
     def _build_vepfs_storages(
@@ -168,30 +242,33 @@ class VolcMLPlatformClient:
             return []
         
         mount = self._service.get_vepfs_mount(qid)
+        rw_dirs = mount.read_write_set
+        ro_dirs = mount.read_only_set
+        mount_root = f'/{mount.VepfsName}'
+        host_root = f'/mnt/{mount.VepfsName}'
         storages = []
         
         for path in sub_paths:  # eg. `/fs_users`
-            if path in mount.ReadWriteDirectories:
+            if path in rw_dirs:
                 read_only = False
-            elif path in mount.ReadOnlyDirectories:
+            elif path in ro_dirs:
                 read_only = True
             else:
                 dirs = mount.ReadWriteDirectories + mount.ReadOnlyDirectories
                 raise ValueError(f'`{path}` not in vePFS directories {dirs}')
             model = VepfsStorageModel(
                 type=mount.StorageType,
-                mount_path=f'/{mount.VepfsName}{path}',
+                mount_path=f'{mount_root}{path}',
                 vepfs_name=mount.VepfsName,
                 read_only=read_only,
                 sub_path=path[1:],
                 vepfs_id=mount.VepfsId,
-                vepfs_host_path=f'/mnt/{mount.VepfsName}',
+                vepfs_host_path=host_root,
             )
             storages.append(model)
 
         return storages
     
-    @handle_exceptions   
     def submit_task(
         self, 
         *,
@@ -201,7 +278,7 @@ class VolcMLPlatformClient:
         enable_range_type: Literal['Public', 'Private'] = 'Public',
         image_repo: str,
         image_tag: str,
-        commands: List[str] = [],
+        commands: Union[str, List[str]] = [],
         default_qid: str,
         backup_qids: List[str] = [],
         priority: int = 6,
@@ -220,7 +297,7 @@ class VolcMLPlatformClient:
         print_task_params: bool = False,
         handle_exceptions: bool = False,
         **kwds,
-    ) -> VolcMLPlatformTask:
+    ) -> Optional[VolcMLPlatformTask]:
         """Create task in optimal queue on Volcano Engine ML platform.
         
         Args:
@@ -233,7 +310,7 @@ class VolcMLPlatformClient:
             image_repo: Address of image repository.
             image_tag: Tag of image.
             commands: A list of strings representing the entrypoint commands to be 
-                executed in the task.
+                executed in the task, or a single string of the whole script.
             default_qid: ID of the default resource queue to submit the task.
             backup_qids: A list of backup resource queue IDs. Submissions to backup
                 queues will be made in case that default queue does not have enough
@@ -261,64 +338,92 @@ class VolcMLPlatformClient:
                 the output will be `None` if any exception is raised.
                 
         Returns:
-            A `VolcMLPlatformTask` instance.
+            A `VolcMLPlatformTask` instance, or `None` if `handle_exceptions` is True
+            and an exception was raised.
         """
-        # Build task parameters.
-        self._validate_task_name(name)
-        image_url = self._validate_image(image_repo, image_tag)
-        flavors_by_zone = self._service.list_flavors()
-        q = self._find_optimal_queue(
-            default_qid=default_qid,
-            flavor_id=flavor_id,
-            flavors_by_zone=flavors_by_zone,
-            backup_qids=backup_qids,
-            cpu_buffer=cpu_buffer,
-            memory_buffer=memory_buffer,
-            volume_buffer=volume_buffer,
-        )        
-        vepfs_storages = self._build_vepfs_storages(vepfs_sub_paths, q.Id)
-        
-        # Submit task form.
-        form_model = TaskFormModel(
-            name=name,
-            description=description,
-            tags=tags,
-            enable_range_type=enable_range_type,
-            image_spec=ImageSpecModel(url=image_url),
-            entrypoint_path=('\n'.join(commands)),
-            resource_queue_id=q.Id,
-            priority=priority,
-            preemptible=preemptible,
-            task_role_specs=[
-                TaskRoleSpecModel(
-                    role_name=role_name,
-                    resource_spec=ResourceSpecModel(
-                        flavor_id=flavor_id,
-                        zone_id=q.ZoneId,
-                        gpu_type=flavors_by_zone[q.ZoneId][flavor_id].GPUType,
-                    ),
+        try:
+            # Build task parameters.
+            # Check arguments before any lookup is sent.
+            self._validate_task_name(name)
+            _require_str(flavor_id, 'flavor ID')
+            if any(
+                (not isinstance(x, (int, float))) or (x < 0) 
+                for x in [cpu_buffer, memory_buffer, volume_buffer]
+            ):
+                raise TypeError('Resource buffers must be non-negative numbers')
+            
+            # These lookups are independent, so run them concurrently.
+            executor = self._get_executor()
+            image_future = executor.submit(
+                self._validate_image, image_repo, image_tag,
+            )
+            flavors_future = executor.submit(self._service.list_flavors)
+            queue_futures = [
+                executor.submit(self._service.get_resource_queue, qid) 
+                for qid in [default_qid, *backup_qids]
+            ]
+            image_url = image_future.result()
+            flavors_by_zone = flavors_future.result()
+            q = self._find_optimal_queue(
+                queue_futures=queue_futures,
+                flavor_id=flavor_id,
+                flavors_by_zone=flavors_by_zone,
+                cpu_buffer=cpu_buffer,
+                memory_buffer=memory_buffer,
+                volume_buffer=volume_buffer,
+            )        
+            vepfs_storages = self._build_vepfs_storages(vepfs_sub_paths, q.Id)
+
+            # Submit task form.
+            form = build_task_form_json(
+                name=name,
+                description=description,
+                tags=tags,
+                enable_range_type=enable_range_type,
+                image_spec=ImageSpecModel(url=image_url),
+                entrypoint_path=(
+                    commands if isinstance(commands, str) else '\n'.join(commands)
+                ),
+                resource_queue_id=q.Id,
+                priority=priority,
+                preemptible=preemptible,
+                task_role_specs=[
+                    TaskRoleSpecModel(
+                        role_name=role_name,
+                        resource_spec=ResourceSpecModel(
+                            flavor_id=flavor_id,
+                            zone_id=q.ZoneId,
+                            gpu_type=flavors_by_zone[q.ZoneId][flavor_id].GPUType,
+                        ),
+                    )
+                ],
+                storages=vepfs_storages,
+                envs=envs,  # validated as `EnvModel` list in one pass
+                active_deadline_seconds=(active_deadline_hours * 60 * 60),
+                delay_exit_time_seconds=(delay_exit_time_minutes * 60),
+            )
+            if print_task_params:
+                # Only serialize if the record is accepted by a sink.
+                logger.opt(lazy=True).info(
+                    'Task parameters:\n{}', 
+                    lambda: _json.dumps_pretty(_json.loads(form)),
                 )
-            ],
-            storages=vepfs_storages,
-            envs=[EnvModel(**v) for v in envs],
-            active_deadline_seconds=(active_deadline_hours * 60 * 60),
-            delay_exit_time_seconds=(delay_exit_time_minutes * 60),
-        )
-        form = form_model.model_dump(
-            mode='json', by_alias=True, exclude_none=True,
-        )
-        if print_task_params:
-            logger.info(f'Task parameters:\n{json.dumps(form, indent=4)}')
-        
-        return VolcMLPlatformTask(
-            form=form,
-            queue=q,
-            credentials=self._credentials,
-            tracking_interval=tracking_interval,
-            print_progress=print_progress,
-            connection_timeout=self._connection_timeout,
-            socket_timeout=self._socket_timeout,
-        )
+
+            return VolcMLPlatformTask(
+                form=form,
+                queue=q,
+                credentials=self._credentials,
+                tracking_interval=tracking_interval,
+                print_progress=print_progress,
+                connection_timeout=self._connection_timeout,
+                socket_timeout=self._socket_timeout,
+                service=self._service,
+            )
+        except Exception as e:
+            if not handle_exceptions:
+                raise
+            logger.exception(e)
+            return None
         
     def stop_task(self, task_id: str) -> bool:
         """Send stop task request to Volcano Engine ML platform.
@@ -338,9 +443,7 @@ class VolcMLPlatformClient:
         
         if status.CreatorUserId != self._iam_user_id:
             logger.warning(f'Attempting to stop task [{task_id}] created by other user')
-        if status.State in [
-            'Success', 'Failed', 'Cancelled', 'Killed', 'Exception', 
-        ]:
+        if status.State in _STOP_WARNING_STATES:
             logger.warning(f'Attempting to stop task [{task_id}] in `{status.State}` state')
         
         # Send stop signal.
@@ -378,7 +481,7 @@ class VolcMLPlatformClient:
                 form={'Id': task_id, 'EnableDiagnosis': False},
             )
         except CallVolcAPIError as e:
-            if e.code in ['UnauthorizedOperation', 'CustomTaskNotInTerminalState']:
+            if e.code in _DELETE_SUPPRESSED_CODES:
                 logger.error(e)
                 return False
             else:
@@ -387,30 +490,132 @@ class VolcMLPlatformClient:
             logger.success(f'Requested to delete task [{task_id}]')
             return True
     
+    def stop_tasks(self, task_ids: List[str]) -> Dict[str, bool]:
+        """Send stop task requests for multiple tasks concurrently.
+        
+        Returns:
+            A dictionary mapping each task ID to whether its request was sent 
+            successfully.
+        """
+        return self._run_for_tasks(self.stop_task, task_ids)
+    
+    def delete_tasks(self, task_ids: List[str]) -> Dict[str, bool]:
+        """Send delete task requests for multiple tasks concurrently.
+        
+        Returns:
+            A dictionary mapping each task ID to whether its request was sent 
+            successfully.
+        """
+        return self._run_for_tasks(self.delete_task, task_ids)
+    
+    def _run_for_tasks(
+        self, 
+        func: Callable[[str], bool], 
+        task_ids: List[str],
+    ) -> Dict[str, bool]:
+        executor = self._get_executor()
+        futures = {task_id: executor.submit(func, task_id) for task_id in task_ids}
+        results = {}
+        for task_id, future in futures.items():
+            try:
+                results[task_id] = future.result()
+            except Exception as e:
+                logger.error(e)
+                results[task_id] = False
+        return results
+    
+    def _feishu_bot_ready(self) -> bool:
+        if not self._feishu_enabled:
+            logger.warning('Feishu bot is not initialized')
+            return False
+        return True
+    
     def send_feishu_message(
         self, 
         receive_id_type: Literal['open_id', 'union_id', 'user_id', 'email', 'chat_id'],
         receive_id: str,
         msg_type: str,
         content: str,  # serialized JSON string
+        dedup_key: Optional[Hashable] = None,
     ) -> bool:
         """Wrapper of sending feishu messages. 
         
         Refer to https://open.feishu.cn/document/server-docs/im-v1/message/create 
         for more details.
         
+        Args:
+            dedup_key: If provided, the message is not sent again to a receiver that 
+                has got, or is getting, a message with the same key within the last 
+                hour, e.g. `(task_id, state)` for task notifications. The outcome of 
+                that earlier send is reported instead.
+        
         Returns:
             A boolean denoting whether the message has been sent successfully.   
         """
-        if self._lark_client is None:
-            logger.warning('Feishu bot is not initialized')
+        if not self._feishu_bot_ready():
             return False
         
+        from .utils import feishu
         resp = feishu.create_message(
             client=self._lark_client,
             receive_id_type=receive_id_type,
             receive_id=receive_id,
             msg_type=msg_type,
             content=content,
+            dedup_key=dedup_key,
+        )
+        return resp.success()
+    
+    def send_feishu_messages(
+        self, 
+        receive_id_type: Literal['open_id', 'union_id', 'user_id', 'email', 'chat_id'],
+        receive_ids: List[str],
+        msg_type: str,
+        content: str,  # serialized JSON string
+        dedup_key: Optional[Hashable] = None,
+    ) -> List[bool]:
+        """Send the same feishu message to several receivers concurrently.
+        
+        Args:
+            dedup_key: See `send_feishu_message`.
+        
+        Returns:
+            Booleans denoting whether the message has been sent successfully to each 
+            receiver, in the order of `receive_ids`.
+        """
+        if not self._feishu_bot_ready():
+            return [False] * len(receive_ids)
+        
+        from .utils import feishu
+        resps = feishu.create_messages(
+            client=self._lark_client,
+            receive_id_type=receive_id_type,
+            receive_ids=receive_ids,
+            msg_type=msg_type,
+            content=content,
+            dedup_key=dedup_key,
+        )
+        return [resp.success() for resp in resps]
+    
+    async def asend_feishu_messages(
+        self, 
+        receive_id_type: Literal['open_id', 'union_id', 'user_id', 'email', 'chat_id'],
+        receive_ids: List[str],
+        msg_type: str,
+        content: str,  # serialized JSON string
+        dedup_key: Optional[Hashable] = None,
+    ) -> List[bool]:
+        """Async version of `send_feishu_messages`, which does not block the event loop."""
+        if not self._feishu_bot_ready():
+            return [False] * len(receive_ids)
+        
+        from .utils import feishu
+        resps = await feishu.acreate_messages(
+            client=self._lark_client,
+            receive_id_type=receive_id_type,
+            receive_ids=receive_ids,
+            msg_type=msg_type,
+            content=content,
+            dedup_key=dedup_key,
         )
-        return resp.success()
\ No newline at end of file
+        return [resp.success() for resp in resps]
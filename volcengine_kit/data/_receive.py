@@ -1,9 +1,51 @@
+import sys
 from datetime import datetime
-from typing import Dict, List, Literal, Optional
+from functools import cached_property
+from typing import Any, Dict, FrozenSet, Iterator, List, Literal, Mapping, Optional
 
 from pydantic import BaseModel, model_validator, Field
 
 
+# Flavor types checked on the queue search path, interned so that comparisons
+# against interned `FlavorModel.Type` short-circuit on identity.
+_GPU_TYPE = sys.intern('GPU型')
+_HPC_GPU_TYPE = sys.intern('高性能计算GPU型')
+
+
+def _parse_datetime(x: str) -> Optional[datetime]:
+    """Parse time like `2024-08-21T18:14:12Z`, or return None if it is empty."""
+    if not x:
+        return None
+    if (
+        len(x) == 20 and x[19] == 'Z' and x[10] == 'T'
+        and x[4] == x[7] == '-' and x[13] == x[16] == ':'
+    ):
+        # Slicing is much faster than `strptime` for this fixed format.
+        parts = (x[0:4], x[5:7], x[8:10], x[11:13], x[14:16], x[17:19])
+        if all(p.isascii() and p.isdigit() for p in parts):
+            try:
+                return datetime(*map(int, parts))
+            except ValueError:  # out of range, let `strptime` raise
+                pass
+    return datetime.strptime(x, '%Y-%m-%dT%H:%M:%SZ')
+
+
+class _ResponseModel(BaseModel):
+    """Base of models parsed from platform API responses."""
+    @classmethod
+    def from_response(cls, data: Dict[str, Any], trusted: bool = False):
+        """Build model from response data. Validation is skipped if `trusted` is 
+        True, in which case `_construct` takes care of field fills and nested models.
+        """
+        if trusted:
+            return cls._construct(data)
+        return cls(**data)
+    
+    @classmethod
+    def _construct(cls, data: Dict[str, Any]):
+        return cls.model_construct(**data)
+
+
 class QuotaItemModel(BaseModel):
     VCPU: int
     Memory: int
@@ -18,7 +60,7 @@ class VolumeItemModel(BaseModel):
     Name: str
     
     
-class VepfsMountModel(BaseModel):
+class VepfsMountModel(_ResponseModel):
     StorageType: Literal['Vepfs']
     VepfsName: str
     VepfsId: str
@@ -26,8 +68,16 @@ class VepfsMountModel(BaseModel):
     ReadWriteDirectories: List[str]
     ReadOnlyDirectories: List[str]
     
+    @cached_property
+    def read_write_set(self) -> FrozenSet[str]:
+        return frozenset(self.ReadWriteDirectories)
+    
+    @cached_property
+    def read_only_set(self) -> FrozenSet[str]:
+        return frozenset(self.ReadOnlyDirectories)
     
-class FlavorModel(BaseModel):
+    
+class FlavorModel(_ResponseModel):
     Name: str
     Id: str
     Type: Literal['通用型', '计算型', '内存型', 'GPU型', '高性能计算GPU型']
@@ -45,19 +95,65 @@ class FlavorModel(BaseModel):
     @model_validator(mode='before')
     @classmethod
     def fields_check(cls, data):
+        return cls._fill_fields(data)
+    
+    @staticmethod
+    def _fill_fields(data):
+        type_ = data.get('Type')
+        if isinstance(type_, str):
+            data['Type'] = sys.intern(type_)
         id_ = data.get('Id', '')
         if id_.startswith('ml.xni'):
             data['GPUType'] = 'X3C'
         return data
     
+    @classmethod
+    def _construct(cls, data):
+        return cls.model_construct(**cls._fill_fields(dict(data)))
+    
     def __str__(self) -> str:
         return f'[flavor ID={self.Id} type={self.Type}]'
     
 
-FlavorsByZone = Dict[str, Dict[str, FlavorModel]]
+FlavorsByZone = Mapping[str, Dict[str, FlavorModel]]
+
+
+class LazyFlavorsByZone(Mapping):
+    """Flavors by zone where raw flavors of a zone are only built into models when 
+    that zone is first accessed. Deprecated flavors are left out.
+    """
+    def __init__(
+        self, 
+        raw_flavors_by_zone: Dict[str, Dict[str, List[Dict[str, Any]]]],
+        trusted: bool = False,
+    ) -> None:
+        self._raw_flavors_by_zone = raw_flavors_by_zone
+        self._trusted = trusted
+        self._flavors_by_zone: Dict[str, Dict[str, FlavorModel]] = {}
+        
+    def __getitem__(self, zone_id: str) -> Dict[str, FlavorModel]:
+        zone_flavors = self._flavors_by_zone.get(zone_id)
+        if zone_flavors is None:
+            raw_zone_flavors = self._raw_flavors_by_zone[zone_id]
+            zone_flavors = {
+                raw_flavor['Id']: FlavorModel.from_response(
+                    raw_flavor, trusted=self._trusted,
+                )
+                for raw_type_flavors in raw_zone_flavors.values()
+                for raw_flavor in raw_type_flavors
+                if not raw_flavor.get('Deprecated', False)
+            }
+            self._flavors_by_zone[zone_id] = zone_flavors
+        return zone_flavors
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw_flavors_by_zone)
+    
+    def __len__(self) -> int:
+        return len(self._raw_flavors_by_zone)
 
 
-class GetResourceQueueResultModel(BaseModel):
+class GetResourceQueueResultModel(_ResponseModel):
     Id: str
     Name: str
     Description: str
@@ -78,6 +174,20 @@ class GetResourceQueueResultModel(BaseModel):
     def __str__(self) -> str:
         return f'[resource queue ID={self.Id} name={self.Name}]'
     
+    # NOTE Queue models are not modified after being fetched, so derived vacant
+    # resources are cached on first access.
+    
+    @classmethod
+    def _construct(cls, data):
+        data = dict(data)
+        for key in ('QuotaCapability', 'QuotaAllocated'):
+            if key in data:
+                data[key] = QuotaItemModel.model_construct(**data[key])
+        for key in ('VolumeCapability', 'VolumeAllocated'):
+            if key in data:
+                data[key] = [VolumeItemModel.model_construct(**x) for x in data[key]]
+        return cls.model_construct(**data)
+    
     @property
     def total_cpu(self) -> int:
         return self.QuotaCapability.VCPU
@@ -86,7 +196,7 @@ class GetResourceQueueResultModel(BaseModel):
     def allocated_cpu(self) -> int:
         return self.QuotaAllocated.VCPU
     
-    @property
+    @cached_property
     def vacant_cpu(self) -> int:
         return self.total_cpu - self.allocated_cpu
     
@@ -98,7 +208,7 @@ class GetResourceQueueResultModel(BaseModel):
     def allocated_memory(self) -> int:
         return self.QuotaAllocated.Memory
     
-    @property
+    @cached_property
     def vacant_memory(self) -> int:
         return self.total_memory - self.allocated_memory
     
@@ -108,10 +218,19 @@ class GetResourceQueueResultModel(BaseModel):
     def allocated_gpu(self, type: str) -> int:
         return self.QuotaAllocated.GPUResources.get(type, 0)
     
+    @cached_property
+    def _vacant_gpu_map(self) -> Dict[str, int]:
+        total = self.QuotaCapability.GPUResources
+        allocated = self.QuotaAllocated.GPUResources
+        return {
+            k: total.get(k, 0) - allocated.get(k, 0) 
+            for k in total.keys() | allocated.keys()
+        }
+    
     def vacant_gpu(self, type: str) -> int:
-        return self.total_gpu(type) - self.allocated_gpu(type)
+        return self._vacant_gpu_map.get(type, 0)
     
-    @property
+    @cached_property
     def vacant_volume(self) -> int:
         total = sum(x.Num for x in self.VolumeCapability)
         allocated = sum(x.Num for x in self.VolumeAllocated)
@@ -119,11 +238,11 @@ class GetResourceQueueResultModel(BaseModel):
     
     def fit_flavor(self, flavor: FlavorModel) -> bool:
         """Check if the capacity of queue can hold provided flavor."""
-        if flavor.Type == '高性能计算GPU型':
+        if flavor.Type == _HPC_GPU_TYPE:
             return False
         cpu_ok = (self.total_cpu >= flavor.vCPU)
         memory_ok = (self.total_memory >= flavor.Memory)
-        if flavor.Type == 'GPU型':
+        if flavor.Type == _GPU_TYPE:
             gpu_ok = (self.total_gpu(type=flavor.GPUType) >= flavor.GPUNum)
         else:
             gpu_ok = True
@@ -137,9 +256,9 @@ class GetResourceQueueResultModel(BaseModel):
         volume_buffer: int = 5,
     ) -> bool:
         """Check if vacant resources in queue allow provided flavor."""
-        if flavor.Type == '高性能计算GPU型':
+        if flavor.Type == _HPC_GPU_TYPE:
             return False
-        if flavor.Type == 'GPU型':
+        if flavor.Type == _GPU_TYPE:
             gpu_ok = (self.vacant_gpu(flavor.GPUType) >= flavor.GPUNum)
         else:
             gpu_ok = True
@@ -149,7 +268,7 @@ class GetResourceQueueResultModel(BaseModel):
         return gpu_ok and cpu_ok and memory_ok and volume_ok
     
     
-class GetImageRepoResultModel(BaseModel):
+class GetImageRepoResultModel(_ResponseModel):
     Id: str
     Namespace: str
     Name: str
@@ -162,8 +281,12 @@ class GetImageRepoResultModel(BaseModel):
     Labels: List[str]
     Registry: str
     
+    @cached_property
+    def tag_set(self) -> FrozenSet[str]:
+        return frozenset(self.Tags)
+    
     
-class GetCustomTaskResultModel(BaseModel):
+class GetCustomTaskResultModel(_ResponseModel):
     Id: str
     Name: str
     Description: str
@@ -185,11 +308,16 @@ class GetCustomTaskResultModel(BaseModel):
     @model_validator(mode='before')
     @classmethod
     def fields_check(cls, data):
-        get_datetime = (
-            lambda x: None if x == '' else datetime.strptime(x, '%Y-%m-%dT%H:%M:%SZ')
-        )
-        data['CreateTime'] = get_datetime(data.get('CreateTime', ''))
-        data['LaunchTime'] = get_datetime(data.get('LaunchTime', ''))
-        data['FinishTime'] = get_datetime(data.get('FinishTime', ''))
-        data['UpdateTime'] = get_datetime(data.get('UpdateTime', ''))
+        return cls._fill_fields(data)
+    
+    @classmethod
+    def _construct(cls, data):
+        return cls.model_construct(**cls._fill_fields(dict(data)))
+
+    @staticmethod
+    def _fill_fields(data):
+        data['CreateTime'] = _parse_datetime(data.get('CreateTime', ''))
+        data['LaunchTime'] = _parse_datetime(data.get('LaunchTime', ''))
+        data['FinishTime'] = _parse_datetime(data.get('FinishTime', ''))
+        data['UpdateTime'] = _parse_datetime(data.get('UpdateTime', ''))
         return data
\ No newline at end of file
@@ -3,29 +3,23 @@ from typing import Optional, Literal, List, Dict, Annotated
 from pydantic import BaseModel, Field, model_validator
 import annotated_types
 
+from .. import _json
+
 
 class ImageSpecModel(BaseModel):
     url: str = Field(serialization_alias='Url')
     type: Optional[Literal['Preset', 'VolcEngine', 'Custom']] = Field(
         default=None, serialization_alias='Type',
     )
+    # XXX For now we keep other fields None.
     purposes: Optional[List[str]] = Field(default=None, serialization_alias='Purposes')
     mode: Optional[Literal['Init']] = Field(default=None, serialization_alias='Mode')
     
-    @model_validator(mode='before')
-    @classmethod
-    def fields_check(cls, data):
-        image_type = data.get('type')
-        if image_type is not None:
-            if image_type not in ('Preset', 'VolcEngine', 'Custom'):
-                raise ValueError(
-                    "Image type must be one of ['Preset', 'VolcEngine', 'Custom']"
-                )
-        
-        # XXX For now we keep other fields None.
-        data['purposes'] = None
-        data['mode'] = None        
-        return data
+    @model_validator(mode='after')
+    def fields_check(self):
+        if self.purposes is not None or self.mode is not None:
+            raise ValueError('`purposes` and `mode` of image spec must be None')
+        return self
     
     
 class ResourceSpecModel(BaseModel):
@@ -39,22 +33,16 @@ class ResourceSpecModel(BaseModel):
     
 class TaskRoleSpecModel(BaseModel):
     role_name: str = Field(serialization_alias='RoleName')
-    role_replicas: Literal[1] = Field(serialization_alias='RoleReplicas')
+    role_replicas: Literal[1] = Field(default=1, serialization_alias='RoleReplicas')
     resource_spec: ResourceSpecModel = Field(serialization_alias='ResourceSpec')
-    role_min_replicas: Literal[1] = Field(serialization_alias='RoleMinReplicas')
-    role_max_failed: Literal[0] = Field(serialization_alias='RoleMaxFailed')
-    role_restart_policy: Literal['Never'] = Field(serialization_alias='RoleRestartPolicy')
-    role_restart_max_retry_count: Literal[0] = Field(serialization_alias='RoleRestartMaxRetryCount')
-    
-    @model_validator(mode='before')
-    @classmethod
-    def fields_check(cls, data):
-        data['role_replicas'] = 1
-        data['role_min_replicas'] = 1
-        data['role_max_failed'] = 0
-        data['role_restart_policy'] = 'Never'
-        data['role_restart_max_retry_count'] = 0
-        return data
+    role_min_replicas: Literal[1] = Field(default=1, serialization_alias='RoleMinReplicas')
+    role_max_failed: Literal[0] = Field(default=0, serialization_alias='RoleMaxFailed')
+    role_restart_policy: Literal['Never'] = Field(
+        default='Never', serialization_alias='RoleRestartPolicy',
+    )
+    role_restart_max_retry_count: Literal[0] = Field(
+        default=0, serialization_alias='RoleRestartMaxRetryCount',
+    )
 
     
 class VepfsStorageModel(BaseModel):
@@ -78,7 +66,8 @@ class EnvModel(BaseModel):
     is_private: bool = Field(default=False, serialization_alias='IsPrivate')
     
     
-class TaskFormModel(BaseModel):
+class _TaskFormDynamicModel(BaseModel):
+    """Fields of task form that vary between submissions."""
     name: str = Field(min_length=1, serialization_alias='Name')
     
     description: str = Field(default='', serialization_alias='Description')
@@ -90,8 +79,6 @@ class TaskFormModel(BaseModel):
     )
     
     image_spec: ImageSpecModel = Field(serialization_alias='ImageSpec')
-  
-    source_code_state: Literal[-1] = Field(serialization_alias='SourceCodeState')
     
     entrypoint_path: str = Field(serialization_alias='EntrypointPath')
     
@@ -105,14 +92,31 @@ class TaskFormModel(BaseModel):
         description='Set to true might cause the task to be ceased at any time',
     )
     
-    framework: Literal['Custom'] = Field(default='Custom', serialization_alias='Framework')
-    
     task_role_specs: Annotated[List[TaskRoleSpecModel], annotated_types.Len(1, 1)] = Field(
         serialization_alias='TaskRoleSpecs',
     )
     
     storages: List[VepfsStorageModel] = Field(default_factory=list, serialization_alias='Storages')
     
+    envs: List[EnvModel] = Field(default_factory=list, serialization_alias='Envs')
+    
+    active_deadline_seconds: int = Field(
+        default=864_000, strict=True, ge=0, lt=100_000_000, 
+        serialization_alias='ActiveDeadlineSeconds',
+    )
+    
+    delay_exit_time_seconds: int = Field(
+        default=0, strict=True, ge=0, le=864_000,
+        serialization_alias='DelayExitTimeSeconds',
+    )
+    
+    
+class _TaskFormStaticModel(BaseModel):
+    """Fields of task form that are the same for every task."""
+    source_code_state: Literal[-1] = Field(default=-1, serialization_alias='SourceCodeState')
+    
+    framework: Literal['Custom'] = Field(default='Custom', serialization_alias='Framework')
+    
     diag_options: Annotated[List[DiagOption], annotated_types.Len(3, 3)] = Field(
         default=[
             DiagOption(name='HostPing', enable=False),
@@ -122,53 +126,60 @@ class TaskFormModel(BaseModel):
         serialization_alias='DiagOptions',
     )
 
-    retry_options: Dict[str, bool] = Field(serialization_alias='RetryOptions')
+    retry_options: Dict[str, bool] = Field(
+        default_factory=lambda: {'EnableRetry': False}, serialization_alias='RetryOptions',
+    )
 
     enable_tensorboard: bool = Field(default=False, serialization_alias='EnableTensorBoard')
     
     tensorboard_path: str = Field(default='', serialization_alias='TensorBoardPath')
     
-    access_types: Annotated[List[Literal['Public', 'Private']], annotated_types.Len(1, 1)] = Field(
-        serialization_alias='AccessTypes',
-    )
-    
     access_user_ids: Annotated[List, annotated_types.Len(0, 0)] = Field(
-        serialization_alias='AccessUserIds',
+        default_factory=list, serialization_alias='AccessUserIds',
     )
     
-    code_source: Literal[''] = Field(serialization_alias='CodeSource')
+    code_source: Literal[''] = Field(default='', serialization_alias='CodeSource')
     
-    code_ori_path: Literal[''] = Field(serialization_alias='CodeOriPath')
+    code_ori_path: Literal[''] = Field(default='', serialization_alias='CodeOriPath')
     
-    local_code_path: Literal[''] = Field(serialization_alias='LocalCodePath')
+    local_code_path: Literal[''] = Field(default='', serialization_alias='LocalCodePath')
     
-    tos_code_path: Literal[''] = Field(serialization_alias='TOSCodePath')
+    tos_code_path: Literal[''] = Field(default='', serialization_alias='TOSCodePath')
     
-    envs: List[EnvModel] = Field(default_factory=list, serialization_alias='Envs')
+    advance_args: Dict = Field(default_factory=dict, serialization_alias='AdvanceArgs')
     
-    advance_args: Dict = Field(serialization_alias='AdvanceArgs')
 
-    active_deadline_seconds: int = Field(
-        default=864_000, strict=True, ge=0, lt=100_000_000, 
-        serialization_alias='ActiveDeadlineSeconds',
+class TaskFormModel(_TaskFormDynamicModel, _TaskFormStaticModel):
+    # Filled from `enable_range_type` after validation.
+    access_types: Annotated[List[Literal['Public', 'Private']], annotated_types.Len(1, 1)] = Field(
+        default_factory=list, serialization_alias='AccessTypes',
     )
     
-    delay_exit_time_seconds: int = Field(
-        default=0, strict=True, ge=0, le=864_000,
-        serialization_alias='DelayExitTimeSeconds',
-    )
+    @model_validator(mode='after')
+    def fields_check(self):
+        self.access_types = [self.enable_range_type]
+        return self
+    
     
-    @model_validator(mode='before')
-    @classmethod
-    def fields_check(cls, data):
-        # Do some auto fills.
-        data['source_code_state'] = -1
-        data['retry_options'] = {'EnableRetry': False}
-        data['access_types'] = [data.get('enable_range_type')]
-        data['access_user_ids'] = []
-        data['code_source'] = ''
-        data['code_ori_path'] = ''
-        data['local_code_path'] = ''
-        data['tos_code_path'] = ''
-        data['advance_args'] = {}
-        return data
\ No newline at end of file
+# Static part is validated only once. Its serialized members are spliced into every
+# task form.
+_STATIC_FORM_MEMBERS = _TaskFormStaticModel().model_dump_json(
+    by_alias=True, exclude_none=True,
+).encode()[1:-1]
+
+
+def build_task_form_json(**kwds) -> bytes:
+    """Build JSON of task form, equivalent to dumping `TaskFormModel` by alias.
+    
+    Only the varying fields are validated and serialized, constant ones are spliced 
+    in from a pre-serialized template.
+    """
+    dynamic = _TaskFormDynamicModel(**kwds)
+    dynamic_json = dynamic.model_dump_json(by_alias=True, exclude_none=True).encode()
+    access_types = _json.dumps([dynamic.enable_range_type])
+    return b''.join((
+        dynamic_json[:-1],  # always has members since `Name` is required
+        b',"AccessTypes":', access_types,
+        b',', _STATIC_FORM_MEMBERS,
+        b'}',
+    ))
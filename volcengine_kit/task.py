@@ -1,17 +1,18 @@
 import asyncio
-import time
+import random
 import threading
 from datetime import datetime
-from typing import Union, Optional, List, Dict, Any
+from typing import Union, Optional, List, Dict, Any, Tuple
 
 from volcengine.Credentials import Credentials
 from loguru import logger
 
-from ._service import VolcMLPlatformService
+from ._service import VolcMLPlatformService, get_shared_service
+from ._tracker import GLOBAL_TRACKER
 from .data._receive import GetCustomTaskResultModel, GetResourceQueueResultModel
 
 
-_terminal_task_states = [
+_TERMINAL_TASK_STATES = frozenset((
     'Success', 
     'SuccessHolding', 
     'Failed', 
@@ -19,36 +20,53 @@ _terminal_task_states = [
     'Cancelled', 
     'Killed', 
     'Exception', 
-]
+))
 _DEFAULT_TRACKING_INTERVAL = 10
 _MIN_TRACKING_INTERVAL = 5
 _MAX_TRACKING_INTERVAL = 300
+# Polling backs off exponentially while task waits in these states.
+_WAITING_TASK_STATES = frozenset(('Initialized', 'Queue', 'Queued', 'Pending'))
+_TRACKING_JITTER = 0.1
+
+
+def _resolve(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
 
 
 class VolcMLPlatformTask:
-    """A class of tasks that have been created on platform with status tracking."""
+    """A class of tasks that have been created on platform with status tracking.
+    
+    `_status` is only ever replaced as a whole by the tracker and never mutated, so 
+    properties read it without locking. `state` is a plain attribute mirroring 
+    `_status.State`, since it is read far more often than the others.
+    """
     def __init__(
         self,
-        form: Dict[str, Any],
+        form: Union[Dict[str, Any], bytes],
         queue: GetResourceQueueResultModel,
         credentials: Credentials,
         tracking_interval: Union[int, float],
         print_progress: bool = False,
         connection_timeout: int = 10,
         socket_timeout: int = 10,
+        service: Optional[VolcMLPlatformService] = None,
         **kwds,
     ) -> None:
         self._q = queue
-        self._service = VolcMLPlatformService(
-            credentials=credentials,
-            connection_timeout=connection_timeout,
-            socket_timeout=socket_timeout,
-        )
+        if service is None:
+            service = get_shared_service(
+                credentials=credentials,
+                connection_timeout=connection_timeout,
+                socket_timeout=socket_timeout,
+            )
+        self._service = service
         self._print_progress = print_progress
         
         # Create task on platform and get initial status.
         self._id = self._create_task(form)
         self._status: GetCustomTaskResultModel = self._service.query_task(self._id)
+        self.state: str = self._status.State
         
         if (
             not isinstance(tracking_interval, (int, float))
@@ -61,17 +79,19 @@ class VolcMLPlatformTask:
                 'instead'
             )
             tracking_interval = _DEFAULT_TRACKING_INTERVAL
+        self._tracking_interval = tracking_interval
+        self._poll_delay = tracking_interval
         
-        self._rlock = threading.RLock()
-        self._track_thread = threading.Thread(
-            target=self._track,
-            name=f'Task {self._id} tracking',
-            args=(tracking_interval,),
-            daemon=True,
-        )
-        self._track_thread.start()
+        self._done_lock = threading.Lock()
+        self._done_event = threading.Event()
+        self._done_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        if self.state in _TERMINAL_TASK_STATES:
+            logger.info(f'Task [{self.id}] final state: `{self.state}`')
+            self._mark_done()
+        else:
+            GLOBAL_TRACKER.register(self, tracking_interval)
         
-    def _create_task(self, form: Dict[str, Any]) -> str:
+    def _create_task(self, form: Union[Dict[str, Any], bytes]) -> str:
         """Submit task to ML platform and retrieve task ID."""
         resp = self._service.call_api('CreateCustomTask', form=form)
         task_id = resp.get('Id', '')
@@ -94,10 +114,6 @@ class VolcMLPlatformTask:
     def tags(self) -> List[str]:
         return self._status.Tags
     
-    @property
-    def state(self) -> str:
-        return self._status.State
-    
     @property
     def queue_id(self) -> str:
         return self._status.ResourceQueueId
@@ -126,21 +142,48 @@ class VolcMLPlatformTask:
     def update_time(self) -> Optional[datetime]:
         return self._status.UpdateTime
     
-    def _track(self, tracking_interval: Union[int, float]) -> None:
-        """Intermittently query task status until it reaches a terminal state."""
-        while self.state not in _terminal_task_states:
-            time.sleep(tracking_interval)
+    def _poll(self) -> Optional[float]:
+        """Query task status once. Return seconds to wait before next query, or None 
+        if task has reached a terminal state.
+        """
+        prev_state = self.state
+        try:
+            status = self._service.query_task(self._id)
+            self.state = status.State
+            self._status = status
+        except Exception as e:
+            logger.exception(e)
+        state = self.state
+        if self._print_progress:
+            logger.info(f'Task [{self._id}] current state: `{state}`')
+        if state in _TERMINAL_TASK_STATES:
+            logger.info(f'Task [{self._id}] final state: `{state}`')
+            self._mark_done()
+            return None
+        
+        if state == prev_state and state in _WAITING_TASK_STATES:
+            self._poll_delay = min(self._poll_delay * 2, _MAX_TRACKING_INTERVAL)
+        else:
+            self._poll_delay = self._tracking_interval
+        # Jitter keeps polls of tasks created together from lining up.
+        return self._poll_delay * random.uniform(1 - _TRACKING_JITTER, 1 + _TRACKING_JITTER)
+    
+    def _mark_done(self) -> None:
+        """Wake up everyone waiting on `finished`."""
+        with self._done_lock:
+            self._done_event.set()
+            waiters, self._done_waiters = self._done_waiters, []
+        for loop, fut in waiters:
             try:
-                status = self._service.query_task(self._id)
-                with self._rlock:
-                    self._status = status
-            except Exception as e:
-                logger.exception(e)
-            finally:
-                if self._print_progress:
-                    logger.info(f'Task [{self.id}] current state: `{self.state}`')
-        logger.info(f'Task [{self.id}] final state: `{self.state}`')
+                loop.call_soon_threadsafe(_resolve, fut)
+            except RuntimeError:  # loop already closed
+                pass
 
     async def finished(self) -> None:
-        while self.state not in _terminal_task_states:
-            await asyncio.sleep(1)
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        with self._done_lock:
+            if self._done_event.is_set():
+                return
+            fut = loop.create_future()
+            self._done_waiters.append((loop, fut))
+        await fut
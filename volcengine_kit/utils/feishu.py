@@ -1,5 +1,8 @@
+import asyncio
 import json
-from typing import List, Literal
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Hashable, Iterator, List, Literal, Optional, Tuple
 
 import lark_oapi as lark
 from lark_oapi.api.im.v1 import (
@@ -10,6 +13,32 @@ from lark_oapi.api.im.v1 import (
     ListChatResponse,
 )
 
+from .._cache import TTLCache
+
+
+_MAX_SEND_WORKERS = 16
+_CHAT_PAGE_SIZE = 100  # maximum allowed by `im.v1.chat.list`
+_GROUP_CHATS_CACHE_TTL = 60
+_SENT_CACHE_TTL = 3600
+
+_send_pool: Optional[ThreadPoolExecutor] = None
+_send_pool_pid: Optional[int] = None
+_group_chats_cache = TTLCache(ttl=_GROUP_CHATS_CACHE_TTL, maxsize=16)
+# Keys of recently sent messages, see `dedup_key` of `create_message`.
+_sent_cache = TTLCache(ttl=_SENT_CACHE_TTL, maxsize=10_000)
+
+
+def _get_send_pool() -> ThreadPoolExecutor:
+    # Executor threads do not survive fork, so each process builds its own.
+    global _send_pool, _send_pool_pid
+    pid = os.getpid()
+    if _send_pool_pid != pid:
+        _send_pool = ThreadPoolExecutor(
+            max_workers=_MAX_SEND_WORKERS, thread_name_prefix='feishu-send',
+        )
+        _send_pool_pid = pid
+    return _send_pool
+
 
 def _lark_log_error(func: str, response):
     log_id = response.get_log_id()
@@ -18,26 +47,153 @@ def _lark_log_error(func: str, response):
     )
     
     
+def _build_create_message_request(
+    receive_id_type: str, 
+    receive_id: str, 
+    msg_type: str, 
+    content: str,
+) -> CreateMessageRequest:
+    # Body is a plain model, so fill it directly instead of going through its builder.
+    # Request builder is kept since it also sets method, URI and token types.
+    body = CreateMessageRequestBody()
+    body.receive_id = receive_id
+    body.msg_type = msg_type
+    body.content = content
+    return CreateMessageRequest.builder() \
+        .receive_id_type(receive_id_type) \
+        .request_body(body) \
+        .build()
+    
+    
+def _create_message(client: lark.Client, request: CreateMessageRequest) -> CreateMessageResponse:
+    response = client.im.v1.message.create(request)
+    if not response.success():
+        _lark_log_error(func='client.im.v1.message.create', response=response)
+    return response
+
+
+async def _acreate_message(
+    client: lark.Client, request: CreateMessageRequest,
+) -> CreateMessageResponse:
+    response = await client.im.v1.message.acreate(request)
+    if not response.success():
+        _lark_log_error(func='client.im.v1.message.acreate', response=response)
+    return response
+
+
+def _claim(
+    receive_id_type: str, receive_id: str, dedup_key: Hashable,
+) -> Tuple[Hashable, Future, bool]:
+    """Record a send of the message. Return its key, the future of the response of 
+    whichever send is in charge of it, and whether that is the caller.
+    """
+    key = (receive_id_type, receive_id, dedup_key)
+    fut = Future()
+    claimed = _sent_cache.setdefault(key, fut)
+    return key, claimed, claimed is fut
+
+
+def _settle(
+    key: Hashable,
+    fut: Future,
+    response: Optional[CreateMessageResponse] = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    if error is not None or not response.success():
+        # Nothing has been delivered, let later calls send again.
+        _sent_cache.invalidate(key)
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(response)
+
+
 def create_message(
     client: lark.Client, 
     receive_id_type: Literal['open_id', 'union_id', 'user_id', 'email', 'chat_id'],
     receive_id: str, 
     msg_type: str,
     content: str,
+    dedup_key: Optional[Hashable] = None,
 ) -> CreateMessageResponse:
-    request = CreateMessageRequest.builder() \
-        .receive_id_type(receive_id_type) \
-        .request_body(
-            CreateMessageRequestBody.builder() \
-                .receive_id(receive_id) \
-                .msg_type(msg_type) \
-                .content(content) \
-                .build() \
-        ).build()
-    response = client.im.v1.message.create(request)
-    if not response.success():
-        _lark_log_error(func='client.im.v1.message.create', response=response)
+    """Send a message. If `dedup_key` is provided and a message with the same key has 
+    been sent, or is being sent, to this receiver within the last hour, it is not sent 
+    again and the response of that send is returned instead.
+    """
+    request = _build_create_message_request(receive_id_type, receive_id, msg_type, content)
+    if dedup_key is None:
+        return _create_message(client, request)
+    key, fut, owner = _claim(receive_id_type, receive_id, dedup_key)
+    if not owner:
+        return fut.result()
+    try:
+        response = _create_message(client, request)
+    except BaseException as e:
+        _settle(key, fut, error=e)
+        raise
+    _settle(key, fut, response=response)
+    return response
+
+
+async def acreate_message(
+    client: lark.Client, 
+    receive_id_type: Literal['open_id', 'union_id', 'user_id', 'email', 'chat_id'],
+    receive_id: str, 
+    msg_type: str,
+    content: str,
+    dedup_key: Optional[Hashable] = None,
+) -> CreateMessageResponse:
+    """Async version of `create_message`."""
+    request = _build_create_message_request(receive_id_type, receive_id, msg_type, content)
+    if dedup_key is None:
+        return await _acreate_message(client, request)
+    key, fut, owner = _claim(receive_id_type, receive_id, dedup_key)
+    if not owner:
+        return await asyncio.wrap_future(fut)
+    try:
+        response = await _acreate_message(client, request)
+    except BaseException as e:
+        _settle(key, fut, error=e)
+        raise
+    _settle(key, fut, response=response)
     return response
+
+
+def create_messages(
+    client: lark.Client, 
+    receive_id_type: Literal['open_id', 'union_id', 'user_id', 'email', 'chat_id'],
+    receive_ids: List[str], 
+    msg_type: str,
+    content: str,
+    dedup_key: Optional[Hashable] = None,
+) -> List[CreateMessageResponse]:
+    """Send the same message to every receiver concurrently, responses in order."""
+    if len(receive_ids) <= 1:
+        return [
+            create_message(client, receive_id_type, receive_id, msg_type, content, dedup_key) 
+            for receive_id in receive_ids
+        ]
+    return list(_get_send_pool().map(
+        lambda receive_id: create_message(
+            client, receive_id_type, receive_id, msg_type, content, dedup_key,
+        ),
+        receive_ids,
+    ))
+
+
+async def acreate_messages(
+    client: lark.Client, 
+    receive_id_type: Literal['open_id', 'union_id', 'user_id', 'email', 'chat_id'],
+    receive_ids: List[str], 
+    msg_type: str,
+    content: str,
+    dedup_key: Optional[Hashable] = None,
+) -> List[CreateMessageResponse]:
+    """Async version of `create_messages`, requests overlap on the running loop."""
+    return list(await asyncio.gather(*(
+        acreate_message(client, receive_id_type, receive_id, msg_type, content, dedup_key)
+        for receive_id in receive_ids
+    )))
         
         
 def _build_list_chat_request(page_size: int, page_token: str) -> ListChatRequest:
@@ -59,22 +215,51 @@ def _get_list_group_chats_response_single_page(
     return response   
 
         
-def list_group_chats(client: lark.Client, page_size: int = 20) -> List[str]:
-    response = _get_list_group_chats_response_single_page(
-        client=client, page_size=page_size, page_token='',
-    )
-    if not response.success():
-        return []
-    chat_ids = [item.chat_id for item in response.data.items]
-    page_token = response.data.page_token
-    
-    while page_token:
+def _iter_group_chat_pages(client: lark.Client, page_size: int) -> Iterator[ListChatResponse]:
+    """Yield responses of successive pages, stopping after the first failed one."""
+    page_token = ''
+    while True:
         response = _get_list_group_chats_response_single_page(
             client=client, page_size=page_size, page_token=page_token,
         )
+        yield response
         if not response.success():
-            return chat_ids
-        chat_ids.extend([item.chat_id for item in response.data.items])
+            return
         page_token = response.data.page_token
-    
-    return chat_ids
\ No newline at end of file
+        if not page_token:
+            return
+
+
+def iter_group_chats(client: lark.Client, page_size: int = _CHAT_PAGE_SIZE) -> Iterator[str]:
+    """Lazily yield IDs of group chats the bot is in, fetching pages only as needed."""
+    for response in _iter_group_chat_pages(client, page_size):
+        if not response.success():
+            return
+        for item in response.data.items:
+            yield item.chat_id
+
+
+def _list_group_chats(client: lark.Client, page_size: int) -> Tuple[List[str], bool]:
+    """Return IDs of group chats and whether every page has been listed."""
+    chat_ids = []
+    for response in _iter_group_chat_pages(client, page_size):
+        if not response.success():
+            return chat_ids, False
+        chat_ids.extend([item.chat_id for item in response.data.items])
+    return chat_ids, True
+
+
+def list_group_chats(client: lark.Client, page_size: int = _CHAT_PAGE_SIZE) -> List[str]:
+    """IDs of group chats the bot is in, cached per client for a short while."""
+    chat_ids, complete = _group_chats_cache.get(
+        client, lambda: _list_group_chats(client, page_size),
+    )
+    if not complete:
+        # Do not keep partial results around.
+        _group_chats_cache.invalidate(client)
+    return list(chat_ids)
+
+
+def invalidate_group_chats(client: Optional[lark.Client] = None) -> None:
+    """Drop cached group chats of `client`, or of every client if it is None."""
+    _group_chats_cache.invalidate(client)